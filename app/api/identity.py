@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.auth import AuthService
+from app.core.config import settings
 from app.service.identity import IdentityService
-from app.schemas.identity import Identity, IdentityCreate, IdentityUpdate
-from typing import List
+from app.service.identity_import import IdentityImporter, SUPPORTED_FORMATS
+from app.schemas.identity import Identity, IdentityCreate, IdentityUpdate, ProvisioningStatus
+from tempfile import SpooledTemporaryFile
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -26,8 +30,10 @@ async def create_identity(
     **Business Process:**
     1. Validates user information and business role
     2. Maps business role to appropriate entitlements
-    3. Provisions user to target applications (Slack, etc.)
-    4. Returns complete identity record with assigned entitlements
+    3. Queues provisioning to target applications (Slack, etc.) in the same transaction
+    4. Returns complete identity record with assigned entitlements and `provisioning_status`
+    
+    Provisioning runs in the background; poll `GET /{identity_id}/provisioning` for its outcome.
     
     **Supported Business Roles:**
     - `developer`, `tester`, `manager`, `hr`, `designer`, `analyst`
@@ -41,6 +47,44 @@ async def create_identity(
         logging.error(f"Error creating identity: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@router.post("/import", summary="Bulk Import Identities")
+async def import_identities(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson or csv (defaults from Content-Type)"),
+    db: Session = Depends(get_db),
+    _: bool = Depends(AuthService.verify_hr_access)
+):
+    """
+    **Bulk Import Identities** (HR Only)
+    
+    Streams identities from an NDJSON or CSV request body and inserts them in chunked transactions.
+    **Restricted to HR personnel only.**
+    
+    **Required Header:**
+    - `X-User-Role`: Must be "hr"
+    - `Content-Type`: `application/x-ndjson` or `text/csv` (or pass `?format=`)
+    
+    **Input:**
+    - NDJSON: one identity object per line
+    - CSV: header row with identity field names, one identity per row
+    
+    **Response:**
+    NDJSON stream with one result per input row (`created` with `id`, or `error` with the reason),
+    followed by a `summary` line. Provisioning for created identities is queued per chunk.
+    """
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format '{fmt}'")
+    
+    # Spool the body before responding: the response stream cannot also read the request
+    body = SpooledTemporaryFile(max_size=settings.import_spool_max_memory)
+    async for chunk in request.stream():
+        body.write(chunk)
+    
+    # The importer opens its own sessions so it outlives the request dependency
+    importer = IdentityImporter(db.get_bind())
+    return StreamingResponse(importer.stream(body, fmt), media_type="application/x-ndjson")
+
 @router.get("/employees/all", response_model=List[Identity], summary="Get All Employees")
 def get_all_employees(
     db: Session = Depends(get_db),
@@ -124,4 +168,31 @@ async def update_identity(
     identity = await service.update_identity(identity_id, update_data)
     if not identity:
         raise HTTPException(status_code=404, detail="Identity not found")
-    return identity
\ No newline at end of file
+    return identity
+
+@router.get("/{identity_id}/provisioning", response_model=ProvisioningStatus, summary="Get Provisioning Status")
+def get_provisioning_status(
+    identity_id: int,
+    db: Session = Depends(get_db),
+    _: bool = Depends(AuthService.verify_hr_access)
+):
+    """
+    **Get Provisioning Status** (HR Only)
+    
+    Returns the latest provisioning job for an identity.
+    **Restricted to HR personnel only.**
+    
+    **Required Header:**
+    - `X-User-Role`: Must be "hr"
+    
+    **Job Status:**
+    - `pending`: Queued or waiting for a retry (see `next_attempt_at`)
+    - `processing`: Being provisioned by a worker
+    - `succeeded`: Provisioned to all target applications
+    - `dead`: Retries exhausted; `last_error` holds the final failure
+    """
+    service = IdentityService(db)
+    job = service.get_provisioning_job(identity_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No provisioning job for identity")
+    return job
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from app.core.auth import AuthService
 from app.service.slack import SlackService
+from app.service.user_directory import user_directory
 from app.schemas.identity import (
     SlackUserRequest, 
     SlackUserResponse, 
@@ -8,6 +9,7 @@ from app.schemas.identity import (
     SlackUserSearchResponse,
     SlackDeleteResponse
 )
+import json
 
 router = APIRouter()
 
@@ -141,4 +143,31 @@ async def delete_slack_user(
         user_id=user_id,
         status=result["status"],
         message=message
-    )
\ No newline at end of file
+    )
+
+@router.post("/events", summary="Slack Events Receiver", include_in_schema=False)
+async def slack_events(body: bytes = Depends(AuthService.verify_slack_request)):
+    """
+    **Slack Events API Receiver**
+    
+    Keeps the Slack user directory cache in sync with `user_change` and `team_join` events.
+    """
+    payload = json.loads(body or b"{}")
+    if payload.get("type") == "url_verification":
+        return {"challenge": payload.get("challenge")}
+    
+    if payload.get("type") == "event_callback":
+        user_directory.apply_event(payload.get("event", {}))
+    return {"ok": True}
+
+@router.get("/cache/stats", summary="Slack User Cache Statistics")
+async def slack_cache_stats(_: bool = Depends(AuthService.verify_hr_access)):
+    """
+    **Slack User Directory Cache Statistics** (HR Only)
+    
+    Returns entry count, hit and miss counters and hit ratio for the email lookup cache.
+    
+    **Required Header:**
+    - `X-User-Role`: Must be "hr"
+    """
+    return user_directory.stats()
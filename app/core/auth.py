@@ -1,5 +1,9 @@
-from fastapi import HTTPException, Header
+from fastapi import HTTPException, Header, Request
+from app.core.config import settings
 from typing import Optional
+import hashlib
+import hmac
+import time
 
 class AuthService:
     @staticmethod
@@ -28,4 +32,22 @@ class AuthService:
         if current_user_role.lower() not in allowed_roles:
             raise HTTPException(status_code=403, detail="Invalid user role")
         
-        return current_user_role.lower()
\ No newline at end of file
+        return current_user_role.lower()
+    
+    @staticmethod
+    async def verify_slack_request(request: Request) -> bytes:
+        """Verify the Slack request signature (when a signing secret is configured) and return the raw body"""
+        body = await request.body()
+        if not settings.slack_signing_secret:
+            return body
+        
+        timestamp = request.headers.get("X-Slack-Request-Timestamp", "")
+        signature = request.headers.get("X-Slack-Signature", "")
+        if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > 60 * 5:
+            raise HTTPException(status_code=401, detail="Stale or missing Slack request timestamp")
+        
+        basestring = f"v0:{timestamp}:".encode() + body
+        expected = "v0=" + hmac.new(settings.slack_signing_secret.encode(), basestring, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, signature):
+            raise HTTPException(status_code=401, detail="Invalid Slack signature")
+        return body
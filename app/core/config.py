@@ -12,5 +12,41 @@ class Settings(BaseSettings):
     slack_signing_secret: str = ""
     secret_key: str = ""
     debug: bool = False
+    
+    # Outbound Slack HTTP client (shared, pooled per process)
+    slack_http2: bool = False
+    slack_timeout: float = 10.0
+    slack_max_connections: int = 100
+    slack_max_keepalive_connections: int = 20
+    slack_keepalive_expiry: float = 30.0
+    
+    # Slack call concurrency and 429 handling
+    slack_invite_concurrency: int = 5
+    slack_max_retries: int = 3
+    # Seconds to collect invites across identities before one call per channel (0 disables)
+    slack_invite_batch_window: float = 0.05
+    
+    # Channel name -> ID cache (seconds)
+    slack_channel_cache_ttl: float = 300.0
+    slack_channel_negative_ttl: float = 60.0
+    
+    # Slack user directory cache (seconds); preload pages users.list in the background
+    slack_user_cache_ttl: float = 3600.0
+    slack_user_negative_ttl: float = 60.0
+    slack_user_preload: bool = True
+    
+    # Provisioning outbox; set PROVISIONING_ASYNC=False to provision inside the request
+    provisioning_async: bool = True
+    provisioning_workers: int = 4
+    provisioning_max_attempts: int = 5
+    provisioning_backoff_base: float = 2.0
+    provisioning_backoff_max: float = 300.0
+    provisioning_poll_interval: float = 1.0
+    provisioning_lease_seconds: float = 300.0
+    
+    # Rows per transaction for streaming bulk import
+    import_chunk_size: int = 500
+    # Request bodies above this many bytes are spooled to disk
+    import_spool_max_memory: int = 8 * 1024 * 1024
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,46 @@
+import httpx
+from app.core.config import settings
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build a pooled AsyncClient configured from settings"""
+    http2 = settings.slack_http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("SLACK_HTTP2 is enabled but 'h2' is not installed, falling back to HTTP/1.1")
+            http2 = False
+    
+    limits = httpx.Limits(
+        max_connections=settings.slack_max_connections,
+        max_keepalive_connections=settings.slack_max_keepalive_connections,
+        keepalive_expiry=settings.slack_keepalive_expiry
+    )
+    return httpx.AsyncClient(limits=limits, timeout=settings.slack_timeout, http2=http2)
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Open the shared client"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+async def close_http_client():
+    """Close the shared client and release pooled connections"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily outside of the lifespan"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
@@ -5,6 +5,11 @@ from app.api.identity import router as identity_router
 from app.api.slack import router as slack_router
 from app.api.employee import router as employee_router
 from app.api.database import router as database_router
+from app.core.http import start_http_client, close_http_client
+from app.service.channel_resolver import channel_resolver
+from app.service.user_directory import user_directory
+from app.service.provisioning import provisioning_workers
+from contextlib import asynccontextmanager
 import logging
 import os
 
@@ -15,7 +20,7 @@ logger = logging.getLogger(__name__)
 # Initialize database on startup
 try:
     from app.core.database import engine, Base
-    from app.models.identity import Identity, TargetApplication
+    from app.models.identity import Identity, TargetApplication, ProvisioningJob
     from sqlalchemy import inspect
     import os
     
@@ -25,7 +30,8 @@ try:
     inspector = inspect(engine)
     existing_tables = inspector.get_table_names()
     
-    if 'identities' not in existing_tables:
+    # New tables (e.g. provisioning_outbox) are added to existing databases too
+    if set(Base.metadata.tables) - set(existing_tables):
         logger.info("Initializing database tables...")
         Base.metadata.create_all(bind=engine)
         logger.info("Database initialized successfully!")
@@ -34,6 +40,22 @@ try:
 except Exception as e:
     logger.error(f"Database initialization error: {str(e)}")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the pooled Slack HTTP client once per process and close it on shutdown
+    await start_http_client()
+    # Workers always drain the outbox (bulk import enqueues even when PROVISIONING_ASYNC is off)
+    provisioning_workers.start()
+    if settings.slack_bot_token:
+        channel_resolver.start()
+        if settings.slack_user_preload:
+            user_directory.start()
+    yield
+    await user_directory.stop()
+    await channel_resolver.stop()
+    await provisioning_workers.stop()
+    await close_http_client()
+
 app = FastAPI(
     title="IGA System - Identity Governance & Administration",
     description="""
@@ -74,6 +96,7 @@ app = FastAPI(
     },
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
     openapi_tags=[
         {
             "name": "Identity Management",
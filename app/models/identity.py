@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Date, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -57,4 +57,26 @@ class TargetApplication(Base):
     auth_type = Column(String)  # OAuth, API Key, etc.
     base_url = Column(String)
     config = Column(JSON)
-    is_active = Column(Boolean, default=True)
\ No newline at end of file
+    is_active = Column(Boolean, default=True)
+
+class ProvisioningJob(Base):
+    """Outbox row written in the same transaction as the identity change it provisions"""
+    __tablename__ = "provisioning_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    identity_id = Column(Integer, ForeignKey("identities.id", ondelete="CASCADE"), index=True)
+    operation = Column(String, default="provision")
+    payload = Column(JSON, nullable=True)
+    
+    # pending -> processing -> succeeded, or back to pending with backoff until dead
+    status = Column(String, default="pending")
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_provisioning_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
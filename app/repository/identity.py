@@ -1,19 +1,48 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from app.models.identity import Identity, TargetApplication
+from app.repository.provisioning import ProvisioningOutboxRepository
 from app.schemas.identity import IdentityCreate, IdentityUpdate
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple
 
 class IdentityRepository:
     def __init__(self, db: Session):
         self.db = db
     
-    def create(self, identity: IdentityCreate) -> Identity:
+    def create(self, identity: IdentityCreate, enqueue_provisioning: bool = False) -> Identity:
         db_identity = Identity(**identity.model_dump())
         self.db.add(db_identity)
+        if enqueue_provisioning:
+            # Outbox row commits atomically with the identity
+            self.db.flush()
+            ProvisioningOutboxRepository(self.db).enqueue(db_identity.id)
         self.db.commit()
         self.db.refresh(db_identity)
         return db_identity
     
+    def bulk_create(self, identities: List[IdentityCreate], enqueue_provisioning: bool = False) -> List[int]:
+        """Insert identities with one executemany and return their ids in input order"""
+        if not identities:
+            return []
+        result = self.db.execute(
+            insert(Identity).returning(Identity.id, sort_by_parameter_order=True),
+            [identity.model_dump() for identity in identities]
+        )
+        ids = [row.id for row in result]
+        if enqueue_provisioning:
+            ProvisioningOutboxRepository(self.db).enqueue_many(ids)
+        self.db.commit()
+        return ids
+    
+    def get_existing_keys(self, employee_ids: List[str], emails: List[str]) -> Tuple[Set[str], Set[str]]:
+        """Return which of the given employee IDs and emails are already taken"""
+        if not employee_ids and not emails:
+            return set(), set()
+        rows = self.db.query(Identity.employee_id, Identity.primary_email).filter(
+            (Identity.employee_id.in_(employee_ids)) | (Identity.primary_email.in_(emails))
+        ).all()
+        return {row.employee_id for row in rows}, {row.primary_email for row in rows}
+    
     def get_by_id(self, identity_id: int) -> Optional[Identity]:
         return self.db.query(Identity).filter(Identity.id == identity_id).first()
     
@@ -26,11 +55,13 @@ class IdentityRepository:
     def get_all(self) -> List[Identity]:
         return self.db.query(Identity).all()
     
-    def update(self, identity_id: int, update_data: IdentityUpdate) -> Optional[Identity]:
+    def update(self, identity_id: int, update_data: IdentityUpdate, enqueue_provisioning: bool = False) -> Optional[Identity]:
         identity = self.get_by_id(identity_id)
         if identity:
             for field, value in update_data.model_dump(exclude_unset=True).items():
                 setattr(identity, field, value)
+            if enqueue_provisioning:
+                ProvisioningOutboxRepository(self.db).enqueue(identity.id)
             self.db.commit()
             self.db.refresh(identity)
         return identity
@@ -0,0 +1,108 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import update, insert
+from app.models.identity import ProvisioningJob
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any
+
+class ProvisioningOutboxRepository:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def enqueue(self, identity_id: int, operation: str = "provision", payload: Optional[Dict[str, Any]] = None) -> ProvisioningJob:
+        """Add a job to the current transaction; the caller commits it with the identity change"""
+        job = ProvisioningJob(
+            identity_id=identity_id,
+            operation=operation,
+            payload=payload,
+            status="pending",
+            attempts=0,
+            next_attempt_at=datetime.now(timezone.utc)
+        )
+        self.db.add(job)
+        return job
+    
+    def enqueue_many(self, identity_ids: List[int], operation: str = "provision"):
+        """Add one job per identity with a single executemany in the current transaction"""
+        if not identity_ids:
+            return
+        now = datetime.now(timezone.utc)
+        self.db.execute(
+            insert(ProvisioningJob),
+            [
+                {"identity_id": identity_id, "operation": operation, "status": "pending", "attempts": 0, "next_attempt_at": now}
+                for identity_id in identity_ids
+            ]
+        )
+    
+    def get_by_id(self, job_id: int) -> Optional[ProvisioningJob]:
+        return self.db.query(ProvisioningJob).filter(ProvisioningJob.id == job_id).first()
+    
+    def get_latest_for_identity(self, identity_id: int) -> Optional[ProvisioningJob]:
+        return (
+            self.db.query(ProvisioningJob)
+            .filter(ProvisioningJob.identity_id == identity_id)
+            .order_by(ProvisioningJob.id.desc())
+            .first()
+        )
+    
+    def claim_due(self, limit: int) -> List[int]:
+        """Move up to `limit` due pending jobs to processing and return their ids"""
+        candidates = (
+            self.db.query(ProvisioningJob.id)
+            .filter(ProvisioningJob.status == "pending", ProvisioningJob.next_attempt_at <= datetime.now(timezone.utc))
+            .order_by(ProvisioningJob.next_attempt_at, ProvisioningJob.id)
+            .limit(limit)
+            .all()
+        )
+        claimed = []
+        for (job_id,) in candidates:
+            # Conditional update so two processes never claim the same job
+            result = self.db.execute(
+                update(ProvisioningJob)
+                .where(ProvisioningJob.id == job_id, ProvisioningJob.status == "pending")
+                .values(status="processing", attempts=ProvisioningJob.attempts + 1)
+            )
+            if result.rowcount == 1:
+                claimed.append(job_id)
+        self.db.commit()
+        return claimed
+    
+    def mark_succeeded(self, job_id: int):
+        self.db.execute(
+            update(ProvisioningJob)
+            .where(ProvisioningJob.id == job_id)
+            .values(status="succeeded", last_error=None)
+        )
+        self.db.commit()
+    
+    def mark_dead(self, job_id: int, error: str):
+        self.db.execute(
+            update(ProvisioningJob)
+            .where(ProvisioningJob.id == job_id)
+            .values(status="dead", last_error=error)
+        )
+        self.db.commit()
+    
+    def mark_failed(self, job_id: int, error: str, max_attempts: int, backoff_base: float, backoff_max: float) -> str:
+        """Schedule a retry with exponential backoff, or dead-letter the job; returns the new status"""
+        job = self.get_by_id(job_id)
+        if job.attempts >= max_attempts:
+            job.status = "dead"
+        else:
+            delay = min(backoff_max, backoff_base * (2 ** (job.attempts - 1)))
+            job.status = "pending"
+            job.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        job.last_error = error
+        self.db.commit()
+        return job.status
+    
+    def requeue_stale(self, lease_seconds: float) -> int:
+        """Return jobs stuck in processing past their lease (crashed worker) to the queue"""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)
+        result = self.db.execute(
+            update(ProvisioningJob)
+            .where(ProvisioningJob.status == "processing", ProvisioningJob.updated_at < cutoff)
+            .values(status="pending")
+        )
+        self.db.commit()
+        return result.rowcount
@@ -76,6 +76,22 @@ class Identity(IdentityBase):
     created_by: str
     updated_at: Optional[datetime] = None
     last_modified_by: str
+    
+    # Status of the latest provisioning run (pending, succeeded, failed), set on create/update
+    provisioning_status: Optional[str] = None
+
+class ProvisioningStatus(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    identity_id: int
+    operation: str
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 class SlackUserRequest(BaseModel):
     email: str
@@ -89,6 +105,7 @@ class SlackUserResponse(BaseModel):
     status: str
     name: Optional[str] = None
     channels_assigned: Optional[list[str]] = None
+    channels_failed: Optional[list[str]] = None
     error: Optional[str] = None
 class SlackCreateUserRequest(BaseModel):
     email: str
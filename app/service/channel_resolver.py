@@ -0,0 +1,104 @@
+import asyncio
+import re
+import time
+from app.core.config import settings
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Slack channel names are lowercase, so an uppercase C/G token is already an ID
+CHANNEL_ID_PATTERN = re.compile(r"^[CG][A-Z0-9]{8,}$")
+
+class ChannelResolver:
+    """Resolves channel names (e.g. #dev-team) to IDs from a cached conversations.list snapshot"""
+    
+    def __init__(self, slack_service=None, ttl: Optional[float] = None, negative_ttl: Optional[float] = None):
+        self._slack_service = slack_service
+        self.ttl = settings.slack_channel_cache_ttl if ttl is None else ttl
+        self.negative_ttl = settings.slack_channel_negative_ttl if negative_ttl is None else negative_ttl
+        self.channels: Dict[str, str] = {}
+        # name -> monotonic time until which the name is known to be missing
+        self.missing: Dict[str, float] = {}
+        self.loaded_at: Optional[float] = None
+        self._load_task: Optional[asyncio.Task] = None
+        self._refresh_loop: Optional[asyncio.Task] = None
+    
+    @property
+    def slack_service(self):
+        if self._slack_service is None:
+            from app.service.slack import SlackService
+            self._slack_service = SlackService()
+        return self._slack_service
+    
+    async def resolve(self, channel: str) -> Optional[str]:
+        """Return the channel ID for a name or ID, or None if it does not exist"""
+        if CHANNEL_ID_PATTERN.match(channel):
+            return channel
+        
+        if self.loaded_at is None:
+            await self.refresh()
+        elif time.monotonic() - self.loaded_at > self.ttl:
+            # Serve the stale map and reload in the background
+            self._schedule_refresh()
+        
+        name = channel.lstrip("#").lower()
+        channel_id = self.channels.get(name)
+        if channel_id:
+            return channel_id
+        
+        now = time.monotonic()
+        if self.missing.get(name, 0) <= now:
+            self.missing[name] = now + self.negative_ttl
+            # A channel created since the last load shows up after the next refresh
+            self._schedule_refresh()
+        return None
+    
+    async def refresh(self):
+        """Reload the name -> ID map; concurrent callers share one in-flight load"""
+        self._schedule_refresh()
+        await asyncio.shield(self._load_task)
+    
+    def _schedule_refresh(self):
+        if self._load_task is None or self._load_task.done():
+            self._load_task = asyncio.ensure_future(self._load())
+    
+    async def _load(self):
+        now = time.monotonic()
+        try:
+            channels = await self.slack_service.list_channels()
+        except Exception as e:
+            logger.error(f"Error loading Slack channels: {str(e)}")
+            channels = None
+        
+        if channels is None:
+            # Keep the previous map and retry after the negative TTL instead of on every call
+            self.loaded_at = now - self.ttl + self.negative_ttl
+            return
+        
+        self.channels = {channel["name"].lower(): channel["id"] for channel in channels}
+        self.missing = {name: until for name, until in self.missing.items() if name not in self.channels}
+        self.loaded_at = now
+        logger.info(f"Loaded {len(self.channels)} Slack channels")
+    
+    async def _refresh_periodically(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.ttl)
+    
+    def start(self):
+        """Keep the map warm from a background task (called from the app lifespan)"""
+        if self._refresh_loop is None or self._refresh_loop.done():
+            self._refresh_loop = asyncio.ensure_future(self._refresh_periodically())
+    
+    async def stop(self):
+        if self._refresh_loop is not None:
+            self._refresh_loop.cancel()
+            try:
+                await self._refresh_loop
+            except asyncio.CancelledError:
+                pass
+            self._refresh_loop = None
+
+# Shared per process so resolution is a dict lookup on the hot path
+channel_resolver = ChannelResolver()
@@ -1,15 +1,23 @@
 from sqlalchemy.orm import Session
 from app.repository.identity import IdentityRepository
+from app.repository.provisioning import ProvisioningOutboxRepository
 from app.schemas.identity import IdentityCreate, IdentityUpdate, Identity
 from app.service.slack import SlackService
+from app.service.invite_batcher import invite_batcher
+from app.service.provisioning import provisioning_workers
+from app.core.config import settings
 from typing import List, Optional, Dict, Any
 import logging
 
 logger = logging.getLogger(__name__)
 
+class ProvisioningError(Exception):
+    """Raised when a target application rejects or only partially applies provisioning"""
+
 class IdentityService:
     def __init__(self, db: Session):
         self.repository = IdentityRepository(db)
+        self.outbox = ProvisioningOutboxRepository(db)
         self.slack_service = SlackService()
     
     async def create_identity(self, identity_data: IdentityCreate) -> Identity:
@@ -18,13 +26,16 @@ class IdentityService:
             entitlements = self._map_business_role_to_entitlements(identity_data.business_role)
             identity_data.entitlements = entitlements
             
-            # Create identity
-            identity = self.repository.create(identity_data)
-            
-            # Provision to target applications
-            await self._provision_to_targets(identity)
+            if settings.provisioning_async:
+                # Identity and outbox job commit together; workers provision in the background
+                identity = self.repository.create(identity_data, enqueue_provisioning=True)
+                provisioning_workers.notify()
+                return self._with_provisioning_status(identity, "pending")
             
-            return identity
+            # Create identity and provision inline
+            identity = self.repository.create(identity_data)
+            status = await self._provision_to_targets(identity)
+            return self._with_provisioning_status(identity, status)
         except Exception as e:
             logger.error(f"Error creating identity: {str(e)}")
             raise
@@ -39,11 +50,30 @@ class IdentityService:
         return self.repository.get_all()
     
     async def update_identity(self, identity_id: int, update_data: IdentityUpdate) -> Optional[Identity]:
+        # Re-provision if business role changed
+        reprovision = bool(update_data.business_role)
+        if settings.provisioning_async:
+            identity = self.repository.update(identity_id, update_data, enqueue_provisioning=reprovision)
+            if not identity:
+                return None
+            if reprovision:
+                provisioning_workers.notify()
+                return self._with_provisioning_status(identity, "pending")
+            return self._with_provisioning_status(identity, None)
+        
         identity = self.repository.update(identity_id, update_data)
-        if identity and update_data.business_role:
-            # Re-provision if business role changed
-            await self._provision_to_targets(identity)
-        return identity
+        if not identity:
+            return None
+        status = await self._provision_to_targets(identity) if reprovision else None
+        return self._with_provisioning_status(identity, status)
+    
+    def get_provisioning_job(self, identity_id: int):
+        return self.outbox.get_latest_for_identity(identity_id)
+    
+    def _with_provisioning_status(self, identity, status: Optional[str]) -> Identity:
+        result = Identity.model_validate(identity)
+        result.provisioning_status = status
+        return result
     
     def _map_business_role_to_entitlements(self, business_role: str) -> Dict[str, Any]:
         """Map business roles to entitlements"""
@@ -112,22 +142,39 @@ class IdentityService:
         
         return role_mappings[role_lower]
     
-    async def _provision_to_targets(self, identity: Identity):
-        """Provision identity to target applications"""
-        try:
-            entitlements = identity.entitlements or {}
-            
-            # Provision to Slack
-            if "slack" in entitlements:
-                slack_config = entitlements["slack"]
-                channels = slack_config.get("channels", [])
-                await self.slack_service.create_user_account(
-                    identity.primary_email, 
-                    identity.first_name, 
-                    identity.last_name, 
-                    channels
+    async def provision_identity(self, identity) -> Dict[str, Any]:
+        """Provision identity to target applications, raising ProvisioningError on failure"""
+        entitlements = identity.entitlements or {}
+        results = {}
+        
+        # Provision to Slack
+        if "slack" in entitlements:
+            slack_config = entitlements["slack"]
+            channels = slack_config.get("channels", [])
+            # Invites from concurrent provisioning are coalesced per channel
+            inviter = invite_batcher.invite if settings.slack_invite_batch_window > 0 else None
+            result = await self.slack_service.create_user_account(
+                identity.primary_email, 
+                identity.first_name, 
+                identity.last_name, 
+                channels,
+                inviter=inviter
+            )
+            if not result.get("user_id"):
+                raise ProvisioningError(f"Slack user not provisioned: {result.get('error', result.get('status'))}")
+            if result.get("channels_failed"):
+                raise ProvisioningError(
+                    f"Identity {identity.id} ({identity.primary_email}) not invited to {result['channels_failed']}"
                 )
+            results["slack"] = result
+        
+        return results
+    
+    async def _provision_to_targets(self, identity) -> str:
+        """Provision inline (outbox disabled) without failing the identity operation"""
+        try:
+            await self.provision_identity(identity)
+            return "succeeded"
         except Exception as e:
             logger.error(f"Error provisioning to targets: {str(e)}")
-            # Don't fail the whole operation if provisioning fails
-            pass
\ No newline at end of file
+            return "failed"
@@ -0,0 +1,171 @@
+import codecs
+import csv
+import json
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from pydantic import ValidationError
+from app.core.config import settings
+from app.repository.identity import IdentityRepository
+from app.schemas.identity import IdentityCreate
+from app.service.provisioning import provisioning_workers
+from typing import AsyncIterator, BinaryIO, Dict, Any, List, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ("ndjson", "csv")
+
+READ_SIZE = 64 * 1024
+
+async def iter_file(body: BinaryIO) -> AsyncIterator[bytes]:
+    """Read a spooled request body back in fixed-size chunks"""
+    body.seek(0)
+    while True:
+        chunk = body.read(READ_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without buffering the whole body"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+    """Parse CSV rows (header first) into dicts; quoted fields may span lines"""
+    header = None
+    pending = None
+    async for line in lines:
+        pending = line if pending is None else f"{pending}\n{line}"
+        if pending.count('"') % 2:
+            # Still inside a quoted field
+            continue
+        values = next(csv.reader([pending]), [])
+        pending = None
+        if not values:
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        # Empty cells mean "not provided" so schema defaults apply
+        yield {name: value for name, value in zip(header, values) if value != ""}
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    async for line in lines:
+        if line.strip():
+            # Decoded per row during validation so one bad line only fails that row
+            yield line
+
+def _format_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in error.errors())
+    return str(error)
+
+class IdentityImporter:
+    """Streams identities from NDJSON/CSV into the database in chunked transactions"""
+    
+    def __init__(self, bind, chunk_size: int = None):
+        self.bind = bind
+        self.chunk_size = chunk_size or settings.import_chunk_size
+    
+    async def stream(self, body: BinaryIO, fmt: str) -> AsyncIterator[bytes]:
+        """Yield one NDJSON result line per input row, then a summary line"""
+        try:
+            lines = iter_lines(iter_file(body))
+            records = iter_csv_records(lines) if fmt == "csv" else iter_ndjson_records(lines)
+            async for result in self.run(records):
+                yield (json.dumps(result, default=str) + "\n").encode()
+        finally:
+            body.close()
+    
+    async def run(self, records: AsyncIterator[Union[str, Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        summary = {"rows": 0, "created": 0, "failed": 0}
+        chunk: List[Tuple[int, Union[str, Dict[str, Any]]]] = []
+        
+        async for record in records:
+            summary["rows"] += 1
+            chunk.append((summary["rows"], record))
+            if len(chunk) >= self.chunk_size:
+                # Database work runs off the event loop so other requests keep flowing
+                for result in await run_in_threadpool(self._import_chunk, chunk, summary):
+                    yield result
+                chunk = []
+        
+        if chunk:
+            for result in await run_in_threadpool(self._import_chunk, chunk, summary):
+                yield result
+        
+        yield {"summary": summary}
+    
+    def _import_chunk(self, chunk, summary) -> List[Dict[str, Any]]:
+        from app.service.identity import IdentityService
+        
+        db = Session(bind=self.bind)
+        try:
+            return self._import_rows(IdentityService(db), chunk, summary)
+        finally:
+            db.close()
+    
+    def _import_rows(self, service, chunk, summary) -> List[Dict[str, Any]]:
+        repository: IdentityRepository = service.repository
+        results = []
+        valid = []
+        
+        for row, record in chunk:
+            try:
+                if isinstance(record, str):
+                    record = json.loads(record)
+                if not isinstance(record, dict):
+                    raise ValueError("Each NDJSON line must be a JSON object")
+                identity = IdentityCreate.model_validate(record)
+                identity.entitlements = service._map_business_role_to_entitlements(identity.business_role)
+                valid.append((row, identity))
+            except ValueError as e:
+                results.append({"row": row, "status": "error", "error": _format_error(e)})
+        
+        # One query for conflicts with existing identities, then de-duplicate within the chunk
+        existing_ids, existing_emails = repository.get_existing_keys(
+            [identity.employee_id for _, identity in valid],
+            [identity.primary_email for _, identity in valid]
+        )
+        to_insert = []
+        for row, identity in valid:
+            if identity.employee_id in existing_ids or identity.primary_email in existing_emails:
+                results.append({"row": row, "status": "error", "error": "Duplicate employee_id or primary_email"})
+                continue
+            existing_ids.add(identity.employee_id)
+            existing_emails.add(identity.primary_email)
+            to_insert.append((row, identity))
+        
+        try:
+            ids = repository.bulk_create([identity for _, identity in to_insert], enqueue_provisioning=True)
+            created = list(zip(to_insert, ids))
+        except IntegrityError:
+            # A concurrent writer took one of the keys; fall back to per-row inserts for this chunk
+            repository.db.rollback()
+            created = []
+            for row, identity in to_insert:
+                try:
+                    created.append(((row, identity), repository.bulk_create([identity], enqueue_provisioning=True)[0]))
+                except IntegrityError:
+                    repository.db.rollback()
+                    results.append({"row": row, "status": "error", "error": "Duplicate employee_id or primary_email"})
+        
+        for (row, identity), identity_id in created:
+            results.append({"row": row, "status": "created", "id": identity_id, "employee_id": identity.employee_id})
+        if created:
+            provisioning_workers.notify()
+        
+        summary["created"] += len(created)
+        summary["failed"] += len(chunk) - len(created)
+        results.sort(key=lambda result: result["row"])
+        return results
@@ -0,0 +1,71 @@
+import asyncio
+from app.core.config import settings
+from app.service.slack import SlackService
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# conversations.invite accepts at most 1000 comma-separated user IDs
+MAX_USERS_PER_INVITE = 1000
+
+class ChannelInviteBatcher:
+    """Coalesces (user, channel) invites from concurrent provisioning into
+    one conversations.invite call per channel chunk"""
+    
+    def __init__(self, slack_service: Optional[SlackService] = None, window: Optional[float] = None):
+        self._slack_service = slack_service
+        self.window = settings.slack_invite_batch_window if window is None else window
+        # channel -> user_id -> futures waiting on that invite
+        self.pending: Dict[str, Dict[str, List[asyncio.Future]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    @property
+    def slack_service(self) -> SlackService:
+        if self._slack_service is None:
+            self._slack_service = SlackService()
+        return self._slack_service
+    
+    async def invite(self, user_id: str, channel: str) -> bool:
+        """Queue an invite and wait for the batched call that carries it"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.setdefault(channel, {}).setdefault(user_id, []).append(future)
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_after_window())
+        return await future
+    
+    async def _flush_after_window(self):
+        try:
+            await asyncio.sleep(self.window)
+        except asyncio.CancelledError:
+            # Shutdown before the flush: release every waiting invite instead of leaving it hanging
+            batch, self.pending = self.pending, {}
+            for users in batch.values():
+                for futures in users.values():
+                    for future in futures:
+                        if not future.done():
+                            future.cancel()
+            raise
+        finally:
+            self._flush_task = None
+        
+        batch, self.pending = self.pending, {}
+        await asyncio.gather(*(self._flush_channel(channel, users) for channel, users in batch.items()))
+    
+    async def _flush_channel(self, channel: str, users: Dict[str, List[asyncio.Future]]):
+        user_ids = list(users)
+        for start in range(0, len(user_ids), MAX_USERS_PER_INVITE):
+            chunk = user_ids[start:start + MAX_USERS_PER_INVITE]
+            try:
+                results = await self.slack_service.invite_users_to_channel(channel, chunk)
+            except Exception as e:
+                logger.error(f"Batched invite to {channel} failed: {str(e)}")
+                results = {}
+            
+            # Hand each waiting identity its own outcome
+            for user_id in chunk:
+                for future in users[user_id]:
+                    if not future.done():
+                        future.set_result(results.get(user_id, False))
+
+invite_batcher = ChannelInviteBatcher()
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.repository.provisioning import ProvisioningOutboxRepository
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ProvisioningWorkerPool:
+    """Drains the provisioning outbox with a pool of async workers"""
+    
+    def __init__(self, session_factory=SessionLocal, workers: Optional[int] = None):
+        self.session_factory = session_factory
+        self.workers = workers or settings.provisioning_workers
+        self._tasks: List[asyncio.Task] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+    
+    def start(self):
+        """Start the dispatcher and workers (called from the app lifespan)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.workers)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(self._dispatch())]
+        self._tasks += [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+    
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._wakeup = None
+    
+    def notify(self):
+        """Wake the dispatcher right after a job is committed instead of waiting for the next poll"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def _dispatch(self):
+        last_requeue = 0.0
+        while True:
+            self._wakeup.clear()
+            db = self.session_factory()
+            try:
+                outbox = ProvisioningOutboxRepository(db)
+                if time.monotonic() - last_requeue > settings.provisioning_lease_seconds:
+                    outbox.requeue_stale(settings.provisioning_lease_seconds)
+                    last_requeue = time.monotonic()
+                job_ids = outbox.claim_due(self.workers)
+            except Exception as e:
+                logger.error(f"Error claiming provisioning jobs: {str(e)}")
+                job_ids = []
+            finally:
+                db.close()
+            
+            # Blocks while all workers are busy, which throttles claiming
+            for job_id in job_ids:
+                await self._queue.put(job_id)
+            
+            if not job_ids:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.provisioning_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self.process(job_id)
+            except Exception as e:
+                logger.error(f"Error processing provisioning job {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+    
+    async def process(self, job_id: int):
+        """Run one claimed job and record success, retry or dead-letter"""
+        from app.service.identity import IdentityService
+        
+        db = self.session_factory()
+        try:
+            outbox = ProvisioningOutboxRepository(db)
+            job = outbox.get_by_id(job_id)
+            service = IdentityService(db)
+            identity = service.repository.get_by_id(job.identity_id)
+            if identity is None:
+                outbox.mark_dead(job_id, "Identity no longer exists")
+                return
+            
+            try:
+                await service.provision_identity(identity)
+            except Exception as e:
+                status = outbox.mark_failed(
+                    job_id,
+                    str(e),
+                    settings.provisioning_max_attempts,
+                    settings.provisioning_backoff_base,
+                    settings.provisioning_backoff_max
+                )
+                logger.warning(f"Provisioning job {job_id} for identity {identity.id} failed ({status}): {str(e)}")
+                return
+            
+            outbox.mark_succeeded(job_id)
+        finally:
+            db.close()
+
+# One pool per process, started by the app lifespan
+provisioning_workers = ProvisioningWorkerPool()
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Slack Web API rate limit tiers (requests per minute, per workspace)
+SLACK_TIER_LIMITS = {1: 1, 2: 20, 3: 50, 4: 100}
+
+# Tier of each Slack API method used by the service
+SLACK_METHOD_TIERS = {
+    "users.lookupByEmail": 3,
+    "users.info": 4,
+    "users.list": 2,
+    "conversations.invite": 3,
+    "conversations.kick": 3,
+    "conversations.list": 2,
+    "admin.users.setInactive": 2,
+    "scim.Users": 2,
+}
+
+DEFAULT_TIER = 3
+
+class TokenBucket:
+    """Token bucket refilled continuously at the tier's per-minute rate.
+    
+    Callers reserve a token up front (the balance may go negative) and sleep
+    off the debt, so waiters are served in arrival order without a lock.
+    """
+    
+    def __init__(self, rate_per_minute: int, capacity: Optional[int] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+    
+    def _refill(self, now: float):
+        # No refill while paused: updated_at is pushed to the end of the pause
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+    
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it"""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        wait = max(self.blocked_until - now, 0.0)
+        if self.tokens < 0:
+            wait += -self.tokens / self.rate
+        return wait
+    
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def pause(self, seconds: float):
+        """Block the bucket for `seconds` and drain it (Slack answered 429)"""
+        now = time.monotonic()
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.tokens = min(self.tokens, 0.0)
+        self.updated_at = self.blocked_until
+
+class SlackRateLimiter:
+    """One token bucket per Slack API method, sized from the method's tier"""
+    
+    def __init__(self, method_tiers: Dict[str, int] = None, tier_limits: Dict[int, int] = None):
+        self.method_tiers = method_tiers or SLACK_METHOD_TIERS
+        self.tier_limits = tier_limits or SLACK_TIER_LIMITS
+        self.buckets: Dict[str, TokenBucket] = {}
+    
+    def bucket(self, api_method: str) -> TokenBucket:
+        bucket = self.buckets.get(api_method)
+        if bucket is None:
+            tier = self.method_tiers.get(api_method, DEFAULT_TIER)
+            bucket = TokenBucket(self.tier_limits[tier])
+            self.buckets[api_method] = bucket
+        return bucket
+    
+    async def acquire(self, api_method: str):
+        await self.bucket(api_method).acquire()
+    
+    def retry_after(self, api_method: str, seconds: float):
+        logger.warning(f"Slack rate limited {api_method}, pausing for {seconds}s")
+        self.bucket(api_method).pause(seconds)
+
+# Shared by every SlackService in the process so limits apply workspace-wide
+slack_rate_limiter = SlackRateLimiter()
@@ -1,68 +1,150 @@
+import asyncio
 import httpx
 from app.core.config import settings
-from typing import Dict, Any, Optional
+from app.core.http import get_http_client
+from app.service.rate_limit import SlackRateLimiter, slack_rate_limiter
+from app.service.channel_resolver import channel_resolver
+from app.service.user_directory import user_directory
+from typing import Dict, Any, Optional, List, Callable, Awaitable
 import logging
 
 logger = logging.getLogger(__name__)
 
 class SlackService:
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, rate_limiter: Optional[SlackRateLimiter] = None):
+        self._client = client
+        self.rate_limiter = rate_limiter or slack_rate_limiter
         self.base_url = "https://slack.com/api"
         self.headers = {
             "Authorization": f"Bearer {settings.slack_bot_token}",
             "Content-Type": "application/json"
         }
     
-    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/users.lookupByEmail",
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Looked up per call so long-lived services pick up the client reopened by a new lifespan
+        return self._client or get_http_client()
+    
+    async def _request(self, api_method: str, http_method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a Slack API call through the per-method rate limiter, retrying on 429"""
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire(api_method)
+            response = await self.client.request(
+                http_method,
+                f"{self.base_url}/{path}",
                 headers=self.headers,
-                params={"email": email}
+                **kwargs
             )
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("user") if data.get("ok") else None
-            return None
+            if response.status_code != 429 or attempt >= settings.slack_max_retries:
+                return response
+            
+            attempt += 1
+            self.rate_limiter.retry_after(api_method, float(response.headers.get("Retry-After", 1)))
+    
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        cached, user = user_directory.lookup(email)
+        if cached:
+            return user
+        
+        response = await self._request(
+            "users.lookupByEmail", "GET", "users.lookupByEmail",
+            params={"email": email}
+        )
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("ok"):
+                user_directory.put(email, data["user"])
+                return data["user"]
+            if data.get("error") == "users_not_found":
+                user_directory.put_missing(email)
+        return None
     
     async def invite_user_to_channel(self, user_id: str, channel_id: str) -> bool:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/conversations.invite",
-                headers=self.headers,
-                json={"channel": channel_id, "users": user_id}
-            )
-            return response.status_code == 200 and response.json().get("ok", False)
+        response = await self._request(
+            "conversations.invite", "POST", "conversations.invite",
+            json={"channel": channel_id, "users": user_id}
+        )
+        return response.status_code == 200 and response.json().get("ok", False)
     
-    async def create_slack_user(self, email: str, first_name: str, last_name: str = None) -> Dict[str, Any]:
-        """Create new user in Slack workspace"""
-        async with httpx.AsyncClient() as client:
-            user_data = {
-                "email": email,
-                "name": {
-                    "given_name": first_name,
-                    "family_name": last_name or ""
-                },
-                "userName": email.split('@')[0],
-                "active": True
-            }
+    async def invite_users_to_channel(self, channel_id: str, user_ids: List[str]) -> Dict[str, bool]:
+        """Invite many users to one channel in a single call and return per-user success"""
+        response = await self._request(
+            "conversations.invite", "POST", "conversations.invite",
+            json={"channel": channel_id, "users": ",".join(user_ids), "force": True}
+        )
+        if response.status_code != 200:
+            return {user_id: False for user_id in user_ids}
+        
+        data = response.json()
+        errors = data.get("errors", [])
+        if not data.get("ok") and not errors and data.get("error") != "already_in_channel":
+            # Channel-level failure (channel_not_found, not_in_channel, ...) fails the whole chunk
+            return {user_id: False for user_id in user_ids}
+        
+        failed = {error.get("user") for error in errors if error.get("error") != "already_in_channel"}
+        return {user_id: user_id not in failed for user_id in user_ids}
+    
+    async def _paginate(self, api_method: str, key: str, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Follow response_metadata.next_cursor and collect `key` from every page"""
+        items = []
+        cursor = None
+        while True:
+            page_params = dict(params, cursor=cursor) if cursor else params
+            response = await self._request(api_method, "GET", api_method, params=page_params)
+            if response.status_code != 200:
+                return None
             
-            response = await client.post(
-                f"{self.base_url}/scim/v1/Users",
-                headers=self.headers,
-                json=user_data
-            )
+            data = response.json()
+            if not data.get("ok"):
+                logger.error(f"{api_method} failed: {data.get('error')}")
+                return None
             
-            if response.status_code == 201:
-                return response.json()
-            return None
+            items.extend(data.get(key, []))
+            cursor = data.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                return items
+    
+    async def list_channels(self) -> Optional[List[Dict[str, Any]]]:
+        """Page through conversations.list and return every non-archived channel"""
+        return await self._paginate(
+            "conversations.list", "channels",
+            {"types": "public_channel,private_channel", "exclude_archived": "true", "limit": 1000}
+        )
+    
+    async def list_users(self) -> Optional[List[Dict[str, Any]]]:
+        """Page through users.list and return every workspace member"""
+        return await self._paginate("users.list", "members", {"limit": 200})
+    
+    async def create_slack_user(self, email: str, first_name: str, last_name: str = None) -> Dict[str, Any]:
+        """Create new user in Slack workspace"""
+        user_data = {
+            "email": email,
+            "name": {
+                "given_name": first_name,
+                "family_name": last_name or ""
+            },
+            "userName": email.split('@')[0],
+            "active": True
+        }
+        
+        response = await self._request(
+            "scim.Users", "POST", "scim/v1/Users",
+            json=user_data
+        )
+        
+        if response.status_code == 201:
+            # Drop any cached "not found" so the next lookup sees the new user
+            user_directory.invalidate(email)
+            return response.json()
+        return None
     
     async def get_or_create_user(self, email: str, first_name: str, last_name: str = None) -> Dict[str, Any]:
         """Get existing user or create new one"""
         try:
             # First try to get existing user
             user = await self.get_user_by_email(email)
-            
+        
             if user:
                 return {
                     "user_id": user["id"],
@@ -70,10 +152,10 @@ class SlackService:
                     "status": "existing",
                     "name": user.get("real_name", "")
                 }
-            
+        
             # If user doesn't exist, create new one
             new_user = await self.create_slack_user(email, first_name, last_name)
-            
+        
             if new_user:
                 return {
                     "user_id": new_user.get("id"),
@@ -81,7 +163,7 @@ class SlackService:
                     "status": "created",
                     "name": f"{first_name} {last_name or ''}".strip()
                 }
-            
+        
             return {
                 "user_id": None,
                 "email": email,
@@ -96,8 +178,18 @@ class SlackService:
                 "status": "error",
                 "error": str(e)
             }
-    async def create_user_account(self, email: str, first_name: str, last_name: str = None, channels: list = None) -> Dict[str, Any]:
-        """Main method for user provisioning with channel assignment"""
+    async def create_user_account(
+        self,
+        email: str,
+        first_name: str,
+        last_name: str = None,
+        channels: list = None,
+        inviter: Optional[Callable[[str, str], Awaitable[bool]]] = None
+    ) -> Dict[str, Any]:
+        """Main method for user provisioning with channel assignment.
+        
+        `inviter(user_id, channel)` replaces the direct per-user invite, e.g. with a batcher.
+        """
         # If no Slack token configured, return mock response
         if not settings.slack_bot_token:
             return {
@@ -111,49 +203,60 @@ class SlackService:
         # Get or create user
         result = await self.get_or_create_user(email, first_name, last_name)
         
-        # If user exists or was created successfully, assign to channels
+        # If user exists or was created successfully, assign to channels concurrently
         if result["user_id"] and channels:
-            for channel in channels:
-                await self.invite_user_to_channel(result["user_id"], channel)
-            result["channels_assigned"] = channels
+            semaphore = asyncio.Semaphore(settings.slack_invite_concurrency)
+            invite_one = inviter or self.invite_user_to_channel
+            
+            async def invite(channel: str) -> bool:
+                # Role mappings use names like #dev-team, conversations.invite needs IDs
+                channel_id = await channel_resolver.resolve(channel)
+                if not channel_id:
+                    return False
+                async with semaphore:
+                    return await invite_one(result["user_id"], channel_id)
+            
+            outcomes = await asyncio.gather(*(invite(channel) for channel in channels), return_exceptions=True)
+            failed = [channel for channel, ok in zip(channels, outcomes) if ok is not True]
+            if failed:
+                logger.warning(f"Failed to invite {email} to channels: {failed}")
+                result["channels_failed"] = failed
+            result["channels_assigned"] = [channel for channel in channels if channel not in failed]
         
         return result
     async def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user details by Slack user ID"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/users.info",
-                headers=self.headers,
-                params={"user": user_id}
-            )
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("user") if data.get("ok") else None
-            return None
+        response = await self._request(
+            "users.info", "GET", "users.info",
+            params={"user": user_id}
+        )
+        if response.status_code == 200:
+            data = response.json()
+            return data.get("user") if data.get("ok") else None
+        return None
     
     async def delete_user(self, user_id: str) -> Dict[str, Any]:
         """Delete/deactivate user from Slack workspace"""
-        async with httpx.AsyncClient() as client:
-            # First try SCIM API for deletion
-            response = await client.delete(
-                f"{self.base_url}/scim/v1/Users/{user_id}",
-                headers=self.headers
-            )
-            
-            if response.status_code == 204:
-                return {"status": "deleted", "user_id": user_id}
-            
-            # If SCIM fails, try deactivating user
-            response = await client.post(
-                f"{self.base_url}/admin.users.setInactive",
-                headers=self.headers,
-                json={"user": user_id}
-            )
-            
-            if response.status_code == 200 and response.json().get("ok"):
-                return {"status": "deactivated", "user_id": user_id}
-            
-            return {"status": "failed", "user_id": user_id, "error": "Could not delete user"}
+        # First try SCIM API for deletion
+        response = await self._request(
+            "scim.Users", "DELETE", f"scim/v1/Users/{user_id}"
+        )
+        
+        if response.status_code == 204:
+            user_directory.invalidate_user_id(user_id)
+            return {"status": "deleted", "user_id": user_id}
+        
+        # If SCIM fails, try deactivating user
+        response = await self._request(
+            "admin.users.setInactive", "POST", "admin.users.setInactive",
+            json={"user": user_id}
+        )
+        
+        if response.status_code == 200 and response.json().get("ok"):
+            user_directory.invalidate_user_id(user_id)
+            return {"status": "deactivated", "user_id": user_id}
+        
+        return {"status": "failed", "user_id": user_id, "error": "Could not delete user"}
     
     async def create_new_user_only(self, email: str, first_name: str, last_name: str = None) -> Dict[str, Any]:
         """Create new user without checking if exists"""
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from app.core.config import settings
+from typing import Dict, Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SlackUserDirectory:
+    """email -> Slack user cache with bulk preload, TTL and negative caching"""
+    
+    def __init__(self, slack_service=None, ttl: Optional[float] = None, negative_ttl: Optional[float] = None):
+        self._slack_service = slack_service
+        self.ttl = settings.slack_user_cache_ttl if ttl is None else ttl
+        self.negative_ttl = settings.slack_user_negative_ttl if negative_ttl is None else negative_ttl
+        # email -> (expires_at, user); user is None for a cached "not found"
+        self.entries: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        # Slack user ID -> email, so ID-keyed events can invalidate entries
+        self.emails_by_id: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self._preload_loop: Optional[asyncio.Task] = None
+    
+    @property
+    def slack_service(self):
+        if self._slack_service is None:
+            from app.service.slack import SlackService
+            self._slack_service = SlackService()
+        return self._slack_service
+    
+    def lookup(self, email: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Return (cached, user); cached with user None means known not to exist"""
+        entry = self.entries.get(email.lower())
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return True, entry[1]
+        self.misses += 1
+        return False, None
+    
+    def put(self, email: str, user: Dict[str, Any]):
+        self.entries[email.lower()] = (time.monotonic() + self.ttl, user)
+        if user.get("id"):
+            self.emails_by_id[user["id"]] = email.lower()
+    
+    def put_missing(self, email: str):
+        self.entries[email.lower()] = (time.monotonic() + self.negative_ttl, None)
+    
+    def invalidate(self, email: str):
+        self.entries.pop(email.lower(), None)
+    
+    def invalidate_user_id(self, user_id: str):
+        email = self.emails_by_id.pop(user_id, None)
+        if email:
+            self.invalidate(email)
+    
+    def apply_event(self, event: Dict[str, Any]):
+        """Update the cache from a Slack Events API user_change / team_join event"""
+        if event.get("type") not in ("user_change", "team_join"):
+            return
+        user = event.get("user") or {}
+        email = user.get("profile", {}).get("email")
+        if email:
+            self.put(email, user)
+        elif user.get("id"):
+            self.invalidate_user_id(user["id"])
+    
+    async def preload(self):
+        """Bulk-load every workspace member by paging users.list"""
+        users = await self.slack_service.list_users()
+        if users is None:
+            return
+        for user in users:
+            email = user.get("profile", {}).get("email")
+            if email:
+                self.put(email, user)
+        logger.info(f"Preloaded {len(users)} Slack users into the directory cache")
+    
+    async def _preload_periodically(self):
+        while True:
+            try:
+                await self.preload()
+            except Exception as e:
+                logger.error(f"Error preloading Slack users: {str(e)}")
+            await asyncio.sleep(self.ttl)
+    
+    def start(self):
+        """Preload in the background and repeat every TTL (called from the app lifespan)"""
+        if self._preload_loop is None or self._preload_loop.done():
+            self._preload_loop = asyncio.ensure_future(self._preload_periodically())
+    
+    async def stop(self):
+        if self._preload_loop is not None:
+            self._preload_loop.cancel()
+            try:
+                await self._preload_loop
+            except asyncio.CancelledError:
+                pass
+            self._preload_loop = None
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+# Shared per process so every request sees the same cache
+user_directory = SlackUserDirectory()
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -112,4 +113,215 @@ async def test_slack_service():
     # Test with mock data since we don't have real Slack tokens
     result = await service.create_user_account("test@example.com")
     assert "user_id" in result
-    assert "status" in result
\ No newline at end of file
+    assert "status" in result
+
+def test_slack_services_share_pooled_client():
+    from app.service.slack import SlackService
+    
+    assert SlackService().client is SlackService().client
+
+async def test_slack_channel_invites_retry_after_429(monkeypatch):
+    import httpx
+    from app.core.config import settings
+    from app.service.rate_limit import SlackRateLimiter
+    from app.service.slack import SlackService
+    
+    calls = []
+    
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path.endswith("users.lookupByEmail"):
+            return httpx.Response(200, json={"ok": True, "user": {"id": "U001", "real_name": "Test User"}})
+        if len(calls) == 2:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"ok": True})
+    
+    monkeypatch.setattr(settings, "slack_bot_token", "xoxb-test")
+    # Private limiter fast enough that the post-429 drain costs milliseconds, not a tier interval
+    limiter = SlackRateLimiter(tier_limits={tier: 6000 for tier in range(1, 5)})
+    service = SlackService(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), rate_limiter=limiter)
+    result = await service.create_user_account("retry@example.com", "Test", "User", ["C01DEVTEAM", "C01GENERAL"])
+    
+    assert result["channels_assigned"] == ["C01DEVTEAM", "C01GENERAL"]
+    assert "channels_failed" not in result
+    assert len(calls) == 4
+    
+    async def reject(user_id, channel):
+        return channel != "C01GENERAL"
+    
+    result = await service.create_user_account("retry@example.com", "Test", "User", ["C01DEVTEAM", "C01GENERAL"], inviter=reject)
+    assert result["channels_assigned"] == ["C01DEVTEAM"]
+    assert result["channels_failed"] == ["C01GENERAL"]
+
+async def test_invite_batcher_groups_users_per_channel():
+    import httpx
+    import json
+    from app.service.slack import SlackService
+    from app.service.invite_batcher import ChannelInviteBatcher
+    
+    invites = []
+    
+    def handler(request):
+        body = json.loads(request.content)
+        invites.append(body)
+        errors = [{"user": "U002", "ok": False, "error": "user_is_restricted"}] if "U002" in body["users"] else []
+        return httpx.Response(200, json={"ok": not errors, "errors": errors})
+    
+    service = SlackService(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    batcher = ChannelInviteBatcher(slack_service=service, window=0.01)
+    results = await asyncio.gather(
+        batcher.invite("U001", "C0DEV"),
+        batcher.invite("U002", "C0DEV"),
+        batcher.invite("U001", "C0GENERAL")
+    )
+    
+    assert results == [True, False, True]
+    assert sorted(invite["users"] for invite in invites) == ["U001", "U001,U002"]
+
+async def test_channel_resolver_pages_once_and_caches_misses():
+    import httpx
+    from app.service.slack import SlackService
+    from app.service.channel_resolver import ChannelResolver
+    
+    pages = []
+    
+    def handler(request):
+        cursor = request.url.params.get("cursor")
+        pages.append(cursor)
+        if not cursor:
+            return httpx.Response(200, json={
+                "ok": True,
+                "channels": [{"id": "C01DEVTEAM", "name": "dev-team"}],
+                "response_metadata": {"next_cursor": "page2"}
+            })
+        return httpx.Response(200, json={"ok": True, "channels": [{"id": "C01GENERAL", "name": "general"}]})
+    
+    service = SlackService(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    resolver = ChannelResolver(slack_service=service, ttl=300, negative_ttl=300)
+    
+    assert await resolver.resolve("#dev-team") == "C01DEVTEAM"
+    assert await resolver.resolve("#general") == "C01GENERAL"
+    assert await resolver.resolve("C01GENERAL") == "C01GENERAL"
+    assert await resolver.resolve("#missing") is None
+    await resolver.refresh()
+    assert await resolver.resolve("#missing") is None
+    assert pages == [None, "page2", None, "page2"]
+
+async def test_slack_user_directory_caches_hits_and_misses(monkeypatch):
+    import httpx
+    from app.service import slack
+    from app.service.user_directory import SlackUserDirectory
+    
+    lookups = []
+    
+    def handler(request):
+        email = request.url.params["email"]
+        lookups.append(email)
+        if email == "known@example.com":
+            return httpx.Response(200, json={"ok": True, "user": {"id": "U100", "real_name": "Known"}})
+        return httpx.Response(200, json={"ok": False, "error": "users_not_found"})
+    
+    directory = SlackUserDirectory(ttl=300, negative_ttl=300)
+    monkeypatch.setattr(slack, "user_directory", directory)
+    service = slack.SlackService(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    
+    for _ in range(3):
+        assert (await service.get_user_by_email("known@example.com"))["id"] == "U100"
+        assert await service.get_user_by_email("new@example.com") is None
+    
+    assert lookups == ["known@example.com", "new@example.com"]
+    assert directory.stats()["hits"] == 4
+    assert directory.stats()["misses"] == 2
+    
+    directory.apply_event({"type": "team_join", "user": {"id": "U200", "profile": {"email": "new@example.com"}}})
+    assert (await service.get_user_by_email("new@example.com"))["id"] == "U200"
+
+async def test_provisioning_job_retries_then_dead_letters(monkeypatch):
+    from app.core.config import settings
+    from app.repository.identity import IdentityRepository
+    from app.repository.provisioning import ProvisioningOutboxRepository
+    from app.schemas.identity import IdentityCreate
+    from app.service.identity import IdentityService, ProvisioningError
+    from app.service.provisioning import ProvisioningWorkerPool
+    
+    async def fail(self, identity):
+        raise ProvisioningError("Slack unavailable")
+    
+    monkeypatch.setattr(IdentityService, "provision_identity", fail)
+    monkeypatch.setattr(settings, "provisioning_max_attempts", 2)
+    monkeypatch.setattr(settings, "provisioning_backoff_base", 0.0)
+    
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    identity = IdentityRepository(db).create(IdentityCreate(
+        employee_id="EMP900",
+        primary_email="outbox@example.com",
+        business_role="developer",
+        first_name="Outbox",
+        display_name="Outbox User"
+    ), enqueue_provisioning=True)
+    outbox = ProvisioningOutboxRepository(db)
+    job_id = outbox.get_latest_for_identity(identity.id).id
+    pool = ProvisioningWorkerPool(session_factory=TestingSessionLocal, workers=1)
+    
+    for expected in ("pending", "dead"):
+        assert job_id in outbox.claim_due(10)
+        await pool.process(job_id)
+        db.expire_all()
+        assert outbox.get_by_id(job_id).status == expected
+    
+    assert outbox.get_by_id(job_id).last_error == "Slack unavailable"
+    db.close()
+
+def test_bulk_import_streams_per_row_results(client):
+    import json
+    
+    body = "\n".join([
+        "employee_id,first_name,display_name,primary_email,business_role,department",
+        'EMP500,Ada,"Lovelace, Ada",ada@example.com,developer,Engineering',
+        "EMP501,Grace,Grace Hopper,not-an-email,manager,",
+        "EMP502,Linus,Linus T,ada@example.com,devops,Infra",
+        "EMP503,Alan,Alan Turing,alan@example.com,analyst,Research"
+    ])
+    headers = {"X-User-Role": "hr", "Content-Type": "text/csv"}
+    response = client.post("/api/v1/identity/import", content=body, headers=headers)
+    
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["status"] for line in lines[:-1]] == ["created", "error", "error", "created"]
+    assert lines[-1]["summary"] == {"rows": 4, "created": 2, "failed": 2}
+
+def test_bulk_import_rejects_non_object_ndjson_rows(client):
+    import json
+    
+    body = '["EMP600"]\n{"employee_id": "EMP601", "first_name": "Katherine", "display_name": "K J", "primary_email": "kj@example.com", "business_role": "analyst"}\n'
+    headers = {"X-User-Role": "hr", "Content-Type": "application/x-ndjson"}
+    response = client.post("/api/v1/identity/import", content=body, headers=headers)
+    
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"row": 1, "status": "error", "error": "Each NDJSON line must be a JSON object"}
+    assert lines[1]["status"] == "created"
+
+async def test_slack_service_follows_reopened_http_client():
+    from app.core.http import start_http_client, close_http_client
+    from app.service.slack import SlackService
+    
+    service = SlackService()
+    await close_http_client()
+    client = await start_http_client()
+    
+    assert service.client is client
+    assert not service.client.is_closed
+
+async def test_invite_batcher_releases_waiters_when_flush_is_cancelled():
+    from app.service.invite_batcher import ChannelInviteBatcher
+    
+    batcher = ChannelInviteBatcher(window=10)
+    waiter = asyncio.ensure_future(batcher.invite("U001", "C01DEVTEAM"))
+    await asyncio.sleep(0)
+    batcher._flush_task.cancel()
+    
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert batcher._flush_task is None
+    assert batcher.pending == {}